@@ -5,15 +5,23 @@ from flask import Flask, render_template, request, jsonify, send_from_directory,
 from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import math
+import mimetypes
+import threading
 from dotenv import load_dotenv
-from osint_analyzer import OSINTAnalyzer
+from osint_analyzer import OSINTAnalyzer, json_default
 from datetime import datetime
 import json
 import pandas as pd
 import numpy as np
+import orjson
 
 load_dotenv()
 
+# Some charts are SVG; make sure they are served as images even where the
+# system mime table lacks the type (e.g. some Windows installs)
+mimetypes.add_type('image/svg+xml', '.svg')
+
 
 class NumpyJSONProvider(DefaultJSONProvider):
     """Custom JSON provider that handles numpy and pandas types"""
@@ -26,8 +34,11 @@ class NumpyJSONProvider(DefaultJSONProvider):
                 return None
             return float(obj)
         elif isinstance(obj, np.ndarray):
-            return [NumpyJSONProvider.default(x) if isinstance(x, (np.integer, np.floating)) 
-                    else x for x in obj.tolist()]
+            # tolist() already yields native Python numbers; only float
+            # arrays need NaN/inf masked to None, done in one vectorized pass
+            if obj.dtype.kind == 'f':
+                return np.where(np.isfinite(obj), obj, None).tolist()
+            return obj.tolist()
         elif isinstance(obj, pd.Timestamp):
             return obj.isoformat()
         # Handle pandas NA/NaT
@@ -44,17 +55,51 @@ app.json = NumpyJSONProvider(app)  # Use custom JSON provider
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
 CORS(app)
 
-# Global analyzer instance (in production, consider using sessions or caching)
+# Process-wide analyzer, shared so scraper sessions, caches and compiled
+# selectors are reused across requests. It is built on first use (its setup
+# talks to the network), and each request passes its own results through the
+# pipeline (nothing is stored on the shared instance), so only construction
+# needs the lock; the Reddit scraper serializes its own API calls
 analyzer = None
+analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> OSINTAnalyzer:
+    """Return the shared analyzer, creating it on first call"""
+    global analyzer
+    if analyzer is None:
+        with analyzer_lock:
+            if analyzer is None:
+                analyzer = OSINTAnalyzer()
+    return analyzer
 
 
-def dataframe_to_json_safe(df, num_rows=10):
+def orjson_response(data, status=200):
+    """
+    Build a JSON response serialized with orjson
+    
+    orjson encodes numpy values natively and writes NaN/inf as null, so the
+    payload does not need a recursive cleaning pass first.
+    
+    Args:
+        data: JSON-serializable payload
+        status: HTTP status code
+    
+    Returns:
+        Flask response object
+    """
+    body = orjson.dumps(data, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return app.response_class(body, status=status, mimetype='application/json')
+
+
+def dataframe_to_json_safe(df, num_rows=10, dt_cols=None):
     """
     Convert DataFrame to JSON-safe format, handling NaT and NaN values
     
     Args:
         df: pandas DataFrame
         num_rows: number of rows to return
+        dt_cols: datetime column names (detected from df.dtypes if None)
     
     Returns:
         List of dictionaries safe for JSON serialization
@@ -62,24 +107,24 @@ def dataframe_to_json_safe(df, num_rows=10):
     if df.empty:
         return []
     
-    # Get subset of rows
-    subset = df.head(num_rows).copy()
+    if dt_cols is None:
+        dt_cols = [col for col, dtype in df.dtypes.items()
+                   if pd.api.types.is_datetime64_any_dtype(dtype)]
+    
+    # For a handful of rows, one pass over plain dicts is cheaper than
+    # copying the frame and rebuilding every column
+    records = df.head(num_rows).to_dict('records')
     
-    # Process all columns
-    for col in subset.columns:
-        if pd.api.types.is_datetime64_any_dtype(subset[col]):
-            # Handle datetime columns
-            subset[col] = subset[col].apply(lambda x: x.isoformat() if pd.notna(x) else None)
-        elif pd.api.types.is_numeric_dtype(subset[col]):
-            # Replace NaN/Inf with None for numeric columns
-            subset[col] = subset[col].replace({np.nan: None, np.inf: None, -np.inf: None})
-        else:
-            # For object columns (strings, etc), replace NaN with None
-            subset[col] = subset[col].apply(lambda x: None if pd.isna(x) else x)
+    for record in records:
+        for col in dt_cols:
+            value = record[col]
+            record[col] = None if value is pd.NaT else value.isoformat()
+        
+        for key, value in record.items():
+            if isinstance(value, float) and not math.isfinite(value):
+                record[key] = None
     
-    # Convert to dict and clean again to be absolutely sure
-    records = subset.to_dict('records')
-    return clean_dict_for_json(records)
+    return records
 
 
 def clean_dict_for_json(data):
@@ -92,13 +137,26 @@ def clean_dict_for_json(data):
     Returns:
         Cleaned data safe for JSON serialization
     """
+    # Fast path: an orjson round-trip converts numpy values, maps NaN/inf to
+    # null and formats timestamps in C without walking the structure in Python
+    try:
+        return orjson.loads(orjson.dumps(
+            data, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY
+        ))
+    except TypeError:
+        # e.g. non-string dict keys or unsupported types
+        return _clean_recursive(data)
+
+
+def _clean_recursive(data):
+    """Recursively clean data that orjson cannot serialize (slow path)"""
     if isinstance(data, dict):
-        return {k: clean_dict_for_json(v) for k, v in data.items()}
+        return {k: _clean_recursive(v) for k, v in data.items()}
     elif isinstance(data, list):
-        return [clean_dict_for_json(item) for item in data]
+        return [_clean_recursive(item) for item in data]
     elif isinstance(data, np.ndarray):
         # Convert numpy array to list
-        return [clean_dict_for_json(item) for item in data.tolist()]
+        return [_clean_recursive(item) for item in data.tolist()]
     elif isinstance(data, (np.integer, np.floating)):
         # Handle numpy numeric types
         if np.isnan(data) or np.isinf(data):
@@ -139,8 +197,6 @@ def analyze():
     - news_pages: int (optional)
     - rss_limit: int (optional)
     """
-    global analyzer
-    
     try:
         data = request.get_json()
         
@@ -154,16 +210,16 @@ def analyze():
         news_pages = int(data.get('news_pages', 2))
         rss_limit = int(data.get('rss_limit', 20))
         
-        # Initialize analyzer
-        analyzer = OSINTAnalyzer()
+        osint = get_analyzer()
         
         # Perform analysis
-        results_df, summary = analyzer.analyze(
+        results_df, summary = osint.analyze(
             keyword=keyword,
             sources=sources,
             reddit_limit=reddit_limit,
             news_pages=news_pages,
-            rss_limit=rss_limit
+            rss_limit=rss_limit,
+            store_results=False
         )
         
         if results_df.empty:
@@ -173,7 +229,13 @@ def analyze():
             }), 404
         
         # Generate visualizations
-        visualizations = analyzer.generate_visualizations(results_df, summary)
+        visualizations = osint.generate_visualizations(results_df, summary)
+        
+        # Save results (this request's, not whatever analysis finished last)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"analysis_{keyword.replace(' ', '_')}_{timestamp}"
+        osint.save_results(filename, include_raw=True,
+                           results_df=results_df, summary=summary)
         
         # Convert visualization paths to web-accessible URLs
         viz_urls = {}
@@ -182,12 +244,8 @@ def analyze():
             filename = os.path.basename(path)
             viz_urls[name] = f'/static/images/charts/{filename}'
         
-        # Save results
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"analysis_{keyword.replace(' ', '_')}_{timestamp}"
-        analyzer.save_results(filename, include_raw=True)
-        
-        # Store in session for results page
+        # Store in session for results page (the session cookie goes
+        # through Flask's JSON provider, so it still needs a cleaned copy)
         session['last_analysis'] = {
             'keyword': keyword,
             'summary': clean_dict_for_json(summary),
@@ -195,19 +253,16 @@ def analyze():
             'timestamp': timestamp
         }
         
-        # Return results - ensure everything is JSON-safe
+        # Return results - orjson handles numpy values and NaN itself
         response_data = {
             'success': True,
             'keyword': keyword,
-            'summary': clean_dict_for_json(summary),
+            'summary': summary,
             'visualizations': viz_urls,
             'top_items': dataframe_to_json_safe(results_df, num_rows=10)
         }
         
-        # Double-check: clean the entire response
-        response_data = clean_dict_for_json(response_data)
-        
-        return jsonify(response_data)
+        return orjson_response(response_data)
     
     except ValueError as e:
         return jsonify({'error': f'Invalid parameter: {str(e)}'}), 400
@@ -230,8 +285,6 @@ def results():
 @app.route('/api/status')
 def status():
     """Check system status"""
-    global analyzer
-    
     status_info = {
         'status': 'running',
         'timestamp': datetime.now().isoformat(),
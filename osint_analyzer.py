@@ -11,19 +11,38 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 from datetime import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 
 
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder for numpy types"""
-    def default(self, obj):
-        if isinstance(obj, (np.integer, np.floating)):
-            return float(obj) if not np.isnan(obj) and not np.isinf(obj) else None
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif pd.isna(obj):
+# Exact-type handlers for the values orjson cannot encode itself
+_JSON_DEFAULTS = {
+    pd.Timestamp: lambda obj: obj.isoformat(),
+    type(pd.NaT): lambda obj: None,
+    type(pd.NA): lambda obj: None,
+}
+
+
+def json_default(obj):
+    """
+    Fallback serializer for orjson
+    
+    orjson handles numpy scalars/arrays natively (OPT_SERIALIZE_NUMPY) and
+    writes NaN/inf as null, so only pandas-specific types end up here.
+    """
+    handler = _JSON_DEFAULTS.get(type(obj))
+    if handler is not None:
+        return handler(obj)
+    
+    # Rare types (subclasses, other NA markers) take the slow path
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    try:
+        if pd.isna(obj):
             return None
-        return super().default(obj)
+    except (ValueError, TypeError):
+        pass
+    raise TypeError(f'Object of type {type(obj)} is not JSON serializable')
 
 
 class OSINTAnalyzer:
@@ -67,44 +86,40 @@ class OSINTAnalyzer:
         print(f"Collecting data for keyword: '{keyword}'")
         print(f"{'='*60}\n")
         
-        # Collect from Reddit
+        # Scrape all requested sources concurrently (network-bound)
+        tasks = []
         if 'reddit' in sources:
-            try:
-                print("📱 Collecting Reddit posts...")
-                reddit_posts = self.reddit_scraper.search_posts(
-                    keyword, 
-                    limit=reddit_limit
-                )
-                all_data.extend(reddit_posts)
-                print(f"✓ Collected {len(reddit_posts)} Reddit posts")
-            except Exception as e:
-                print(f"✗ Error collecting Reddit data: {e}")
-        
-        # Collect from Google News
+            tasks.append((
+                'reddit', "📱 Collecting Reddit posts...", "Reddit posts",
+                lambda: self.reddit_scraper.search_posts(keyword, limit=reddit_limit)
+            ))
         if 'news' in sources:
-            try:
-                print("\n📰 Collecting Google News articles...")
-                news_articles = self.news_scraper.search_news(
-                    keyword,
-                    max_pages=news_pages
-                )
-                all_data.extend(news_articles)
-                print(f"✓ Collected {len(news_articles)} news articles")
-            except Exception as e:
-                print(f"✗ Error collecting news data: {e}")
-        
-        # Collect from RSS feeds
+            tasks.append((
+                'news', "📰 Collecting Google News articles...", "news articles",
+                lambda: self.news_scraper.search_news(keyword, max_pages=news_pages)
+            ))
         if 'rss' in sources:
-            try:
-                print("\n📡 Collecting RSS feed articles...")
-                rss_articles = self.rss_scraper.search_default_feeds(
-                    keyword,
-                    limit_per_feed=rss_limit
-                )
-                all_data.extend(rss_articles)
-                print(f"✓ Collected {len(rss_articles)} RSS articles")
-            except Exception as e:
-                print(f"✗ Error collecting RSS data: {e}")
+            tasks.append((
+                'rss', "📡 Collecting RSS feed articles...", "RSS articles",
+                lambda: self.rss_scraper.search_default_feeds(keyword, limit_per_feed=rss_limit)
+            ))
+        
+        if tasks:
+            with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                futures = []
+                for name, message, label, job in tasks:
+                    print(message)
+                    futures.append((name, label, executor.submit(job)))
+                
+                # Collect in submission order (reddit, news, rss) so the
+                # output, and which duplicate survives dedupe, is stable
+                for name, label, future in futures:
+                    try:
+                        items = future.result()
+                        all_data.extend(items)
+                        print(f"✓ Collected {len(items)} {label}")
+                    except Exception as e:
+                        print(f"✗ Error collecting {name} data: {e}")
         
         print(f"\n{'='*60}")
         print(f"Total items collected: {len(all_data)}")
@@ -114,7 +129,7 @@ class OSINTAnalyzer:
     
     def analyze(self, keyword: str, sources: List[str] = None,
                reddit_limit: int = 50, news_pages: int = 2,
-               rss_limit: int = 20) -> Tuple[pd.DataFrame, Dict]:
+               rss_limit: int = 20, store_results: bool = True) -> Tuple[pd.DataFrame, Dict]:
         """
         Complete analysis pipeline: collect data and analyze sentiment
         
@@ -124,6 +139,9 @@ class OSINTAnalyzer:
             reddit_limit: Reddit post limit
             news_pages: News pages to scrape
             rss_limit: RSS articles per feed
+            store_results: Keep the results on the instance for the other
+                           methods' defaults; pass False when the analyzer
+                           is shared between threads
         
         Returns:
             Tuple of (DataFrame with results, summary dictionary)
@@ -147,16 +165,29 @@ class OSINTAnalyzer:
         # Determine text fields based on data structure
         df = pd.DataFrame(data)
         
-        # Standardize field names
-        if 'description' in df.columns:
-            df['text'] = df['description']
-        elif 'selftext' in df.columns:
-            df['text'] = df['selftext']
+        # Drop syndicated duplicates (same normalized title) before scoring
+        df, duplicates_removed = self._drop_duplicate_items(df)
+        if duplicates_removed:
+            print(f"Removed {duplicates_removed} duplicate items")
+        
+        # Reddit timestamps arrive as raw epoch seconds; convert the whole
+        # column at once instead of building a datetime per post
+        if 'created_utc' in df.columns and pd.api.types.is_numeric_dtype(df['created_utc']):
+            df['created_utc'] = pd.to_datetime(df['created_utc'], unit='s')
+        
+        # Standardize field names: use the first non-empty of
+        # description > text > selftext > title as the body text
+        text = pd.Series('', index=df.index, dtype=object)
+        for col in ('title', 'selftext', 'text', 'description'):
+            if col in df.columns:
+                values = df[col].fillna('').astype(str)
+                text = values.where(values.ne(''), text)
+        df['text'] = text
         
         # Analyze sentiment
         results_df = self.sentiment_analyzer.analyze_data_with_sentiment(
-            data,
-            text_field='text' if 'text' in df.columns else 'description',
+            df,
+            text_field='text',
             title_field='title'
         )
         
@@ -167,6 +198,7 @@ class OSINTAnalyzer:
         summary['keyword'] = keyword
         summary['timestamp'] = datetime.now().isoformat()
         summary['sources_used'] = sources if sources else ['reddit', 'news', 'rss']
+        summary['duplicates_removed'] = duplicates_removed
         
         print(f"✓ Sentiment analysis complete")
         print(f"\nResults Summary:")
@@ -176,11 +208,36 @@ class OSINTAnalyzer:
         print(f"  • Neutral: {summary['neutral_count']} ({summary.get('neutral_percent', 0):.1f}%)")
         print(f"  • Average compound score: {summary['avg_compound']:.3f}")
         
-        self.results = results_df
-        self.summary = summary
+        if store_results:
+            self.results = results_df
+            self.summary = summary
         
         return results_df, summary
     
+    @staticmethod
+    def _drop_duplicate_items(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """
+        Remove items whose normalized title was already seen
+        
+        Args:
+            df: DataFrame of collected items
+        
+        Returns:
+            Tuple of (deduplicated DataFrame, number of rows removed)
+        """
+        if 'title' not in df.columns:
+            return df, 0
+        
+        # Compare titles case-insensitively, ignoring punctuation and spacing
+        key = df['title'].fillna('').astype(str).str.lower().str.replace(r'\W+', '', regex=True)
+        duplicated = key.duplicated() & key.ne('')
+        
+        removed = int(duplicated.sum())
+        if removed:
+            df = df[~duplicated].reset_index(drop=True)
+        
+        return df, removed
+    
     def generate_visualizations(self, results_df: pd.DataFrame = None,
                                summary: Dict = None) -> Dict[str, str]:
         """
@@ -213,15 +270,23 @@ class OSINTAnalyzer:
         
         return visualizations
     
-    def save_results(self, filename: str = None, include_raw: bool = False):
+    def save_results(self, filename: str = None, include_raw: bool = False,
+                     results_df: pd.DataFrame = None, summary: Dict = None):
         """
         Save analysis results to files
         
         Args:
             filename: Base filename (without extension)
             include_raw: Whether to include raw data DataFrame
+            results_df: Results DataFrame (uses self.results if None)
+            summary: Summary dictionary (uses self.summary if None)
         """
-        if self.results is None or self.summary is None:
+        if results_df is None:
+            results_df = self.results
+        if summary is None:
+            summary = self.summary
+        
+        if results_df is None or summary is None:
             print("⚠️  No results to save")
             return
         
@@ -231,14 +296,28 @@ class OSINTAnalyzer:
         
         # Save summary as JSON
         summary_path = f"reports/{filename}_summary.json"
-        with open(summary_path, 'w') as f:
-            json.dump(self.summary, f, indent=2, cls=NumpyEncoder)
+        with open(summary_path, 'wb') as f:
+            f.write(orjson.dumps(
+                summary,
+                default=json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
         print(f"✓ Summary saved to: {summary_path}")
         
-        # Save detailed results as CSV
+        # Save detailed results as Parquet (compact, fast to re-read) and CSV
         if include_raw:
+            parquet_path = f"reports/{filename}_detailed.parquet"
+            try:
+                results_df.to_parquet(parquet_path, engine='pyarrow',
+                                        compression='zstd', index=False)
+                print(f"✓ Detailed results saved to: {parquet_path}")
+            except ImportError:
+                print("⚠️  pyarrow not installed, skipping Parquet export")
+            except Exception as e:
+                print(f"✗ Error saving Parquet results: {e}")
+            
             csv_path = f"reports/{filename}_detailed.csv"
-            self.results.to_csv(csv_path, index=False)
+            results_df.to_csv(csv_path, index=False)
             print(f"✓ Detailed results saved to: {csv_path}")
     
     def get_top_items(self, n: int = 10, sort_by: str = 'score') -> pd.DataFrame:
@@ -258,6 +337,23 @@ class OSINTAnalyzer:
         if sort_by not in self.results.columns:
             sort_by = 'avg_compound'
         
+        column = self.results[sort_by]
+        
+        # For large frames, select the top N with an O(N) partition instead
+        # of a full sort
+        if n > 0 and len(column) > 4 * n and pd.api.types.is_numeric_dtype(column):
+            values = column.to_numpy(dtype=float, na_value=np.nan)
+            valid = np.flatnonzero(~np.isnan(values))
+            
+            if len(valid) > n:
+                # Take every row at or above the nth largest value, then
+                # order by value and original position so ties resolve to
+                # the first occurrence, exactly like nlargest
+                threshold = -np.partition(-values[valid], n - 1)[n - 1]
+                candidates = valid[values[valid] >= threshold]
+                order = np.lexsort((candidates, -values[candidates]))
+                return self.results.iloc[candidates[order][:n]]
+        
         return self.results.nlargest(n, sort_by)
     
     def get_trending_topics(self) -> List[str]:
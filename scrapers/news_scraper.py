@@ -3,35 +3,113 @@ Google News Scraper Module
 Adapted from Jose-Sabater/marketeer repository
 Scrapes Google News for articles containing specific keywords
 """
-from urllib.request import Request, urlopen
 from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
+import re
+from lxml import html
+from lxml.cssselect import CSSSelector
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Tuple
 from datetime import datetime
 
 
+# Drop commas and flatten tabs/newlines (which break CSV exports) in one pass
+_STRIP_TABLE = str.maketrans({",": None, "\t": " ", "\r": " ", "\n": " "})
+
+
+class NewsItem:
+    """A single scraped Google News article (slotted, no per-instance __dict__)"""
+    
+    __slots__ = ("link", "title", "text", "description", "time", "source", "scraped_at")
+    
+    def __init__(self, scraped_at: datetime = None, source: str = "google_news"):
+        self.link = ""
+        self.title = ""
+        self.text = ""
+        self.description = ""
+        self.time = ""
+        self.source = source
+        self.scraped_at = scraped_at
+    
+    def to_dict(self) -> Dict:
+        """Convert to the dictionary format returned by the scraper"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
 class NewsScraper:
     """Scrapes Google News based on keywords"""
     
-    def __init__(self):
-        """Initialize the news scraper"""
+    # Search-tool links ("Past hour", "Past 24 hours", ...) that look like articles
+    _NAV_RE = re.compile(r"past hour|past 24|past week|all results", re.IGNORECASE)
+    
+    # CSS selectors compiled once to XPath and reused for every page
+    _SEL_ARTICLE = CSSSelector("div.SoaBEf")
+    _SEL_ARTICLE_ALT = CSSSelector("div.Gx5Zad")
+    _SEL_ARTICLE_HVEID = CSSSelector("div[data-hveid]")
+    _SEL_ARTICLE_XUVV = CSSSelector("div[class*='xuvV6b']")
+    _SEL_LINK = CSSSelector("a[href]")
+    _SEL_HEADING = CSSSelector('div[role="heading"]')
+    _SEL_TITLE = CSSSelector("div.BNeawe.vvjwJb.AP7Wnd")
+    _SEL_HEADER_TAG = CSSSelector("h1, h2, h3, h4")
+    _SEL_DESCRIPTION = CSSSelector("div.BNeawe.s3v9rd.AP7Wnd")
+    _SEL_NEXT = CSSSelector('a[aria-label="Next page"]')
+    _SEL_NEXT_ALT = CSSSelector("a#pnnext")
+    
+    def __init__(self, cache_expire_after: int = 1800):
+        """
+        Initialize the news scraper
+        
+        Args:
+            cache_expire_after: Seconds a fetched results page is reused from
+                                the on-disk cache (default: 30 minutes)
+        """
         self.root = "https://google.com"
-        self.headers = {"User-Agent": "Mozilla/5.0"}
+        self.headers = {
+            "User-Agent": ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                           "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"),
+            "Accept-Encoding": "gzip, deflate",
+            "Accept-Language": "en-US,en;q=0.9"
+        }
+        
+        # Reuse keep-alive connections to Google across result pages, and
+        # cache pages on disk so repeated searches skip the network
+        self.session = requests_cache.CachedSession(
+            cache_name=".news_cache",
+            backend="sqlite",
+            expire_after=cache_expire_after,
+            allowable_methods=("GET",)
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+        
+        # One libxml2 HTML parser reused for every results page (pages are
+        # scraped one after another, never concurrently). Element IDs are
+        # never looked up, so skip building the ID table
+        self._parser = html.HTMLParser(encoding="utf-8", recover=True, collect_ids=False)
     
-    def search_news(self, keyword: str, max_pages: int = 3) -> List[Dict]:
+    def search_news(self, keyword: str, max_pages: int = 3,
+                    max_age: int = None) -> List[Dict]:
         """
         Scrape Google News articles based on a keyword
         
         Args:
             keyword: The keyword to search for
             max_pages: Maximum number of pages to scrape (default: 3)
+            max_age: Maximum age in seconds of cached pages to reuse
+                     (None uses the scraper's cache_expire_after)
         
         Returns:
             List of dictionaries containing news article data
         """
         print(f"Started scraping Google News for '{keyword}'...")
-        news_list = []
+        news_list: List[NewsItem] = []
         
         # Build Google News search URL with proper encoding
         encoded_keyword = quote_plus(keyword)
@@ -39,7 +117,7 @@ class NewsScraper:
         
         try:
             for page in range(max_pages):
-                page_news, next_link = self._scrape_page(link)
+                page_news, next_link = self._scrape_page(link, max_age)
                 news_list.extend(page_news)
                 
                 if not next_link:
@@ -51,81 +129,87 @@ class NewsScraper:
             print(f"Error during news scraping: {e}")
         
         print(f"Scraped {len(news_list)} news articles")
-        return news_list
+        return [item.to_dict() for item in news_list]
     
-    def _scrape_page(self, link: str) -> Tuple[List[Dict], str]:
+    def _scrape_page(self, link: str, max_age: int = None) -> Tuple[List[NewsItem], str]:
         """
         Scrape a single page of Google News results
         
         Args:
             link: URL of the page to scrape
+            max_age: Maximum age in seconds of a cached copy to reuse
         
         Returns:
-            Tuple of (news_list, next_page_link)
+            Tuple of (list of NewsItem, next_page_link)
         """
         news_list = []
         next_link = ""
         
         try:
-            req = Request(link, headers=self.headers)
-            webpage = urlopen(req, timeout=10).read()
+            cache_options = {} if max_age is None else {"expire_after": max_age}
+            response = self.session.get(link, timeout=10, **cache_options)
+            response.raise_for_status()
+            webpage = response.content
             
-            soup = BeautifulSoup(webpage, "html.parser", from_encoding="utf-8")
+            tree = html.document_fromstring(webpage, parser=self._parser)
             
             # Try multiple selectors for Google News articles
             # Google frequently changes these class names
-            articles = soup.find_all("div", attrs={"class": "SoaBEf"})
+            articles = self._SEL_ARTICLE(tree)
             
             if not articles:
-                articles = soup.find_all("div", attrs={"class": "Gx5Zad"})
+                articles = self._SEL_ARTICLE_ALT(tree)
             
             if not articles:
                 # Try finding by data-hveid attribute (more stable)
-                articles = soup.find_all("div", attrs={"data-hveid": True})
-                articles = [a for a in articles if a.find("a", href=True)]
+                articles = self._SEL_ARTICLE_HVEID(tree)
+                articles = [a for a in articles if self._SEL_LINK(a)]
             
             if not articles:
                 # Try finding all divs with links (broader search)
-                articles = soup.find_all("div", class_=lambda x: x and "xuvV6b" in x)
+                articles = self._SEL_ARTICLE_XUVV(tree)
             
             print(f"Found {len(articles)} article containers on page")
             
+            # All articles on a page share one scrape timestamp
+            scraped_at = datetime.now()
+            
             for item in articles:
-                news_dict = {}
+                news_item = NewsItem(scraped_at=scraped_at)
                 
                 try:
                     # Extract link - try multiple methods
-                    link_tag = item.find("a", href=True)
-                    if link_tag:
-                        raw_link = link_tag["href"]
+                    link_tag = self._select_first(item, self._SEL_LINK)
+                    if link_tag is not None:
+                        raw_link = link_tag.get("href")
                         if "/url?q=" in raw_link:
                             article_link = raw_link.split("/url?q=")[1].split("&sa=")[0]
                         elif raw_link.startswith("http"):
                             article_link = raw_link
                         else:
                             article_link = self.root + raw_link
-                        news_dict["link"] = article_link
+                        news_item.link = article_link
                     
                     # Extract title - try multiple methods
-                    title_tag = item.find("div", attrs={"role": "heading"})
-                    if not title_tag:
-                        title_tag = item.find("div", attrs={"class": "BNeawe vvjwJb AP7Wnd"})
-                    if not title_tag:
+                    title_tag = self._select_first(item, self._SEL_HEADING)
+                    if title_tag is None:
+                        title_tag = self._select_first(item, self._SEL_TITLE)
+                    if title_tag is None:
                         # Try finding any heading-like element
-                        title_tag = item.find(["h1", "h2", "h3", "h4"])
-                    if not title_tag and link_tag:
+                        title_tag = self._select_first(item, self._SEL_HEADER_TAG)
+                    if title_tag is None and link_tag is not None:
                         # Use link text as fallback
                         title_tag = link_tag
                     
-                    if title_tag:
-                        title = title_tag.get_text().strip()
-                        news_dict["title"] = title.replace(",", "")
-                        news_dict["text"] = title  # Add text field for sentiment analysis
+                    if title_tag is not None:
+                        title = title_tag.text_content().strip()
+                        news_item.title = title.translate(_STRIP_TABLE)
+                        news_item.text = title  # Add text field for sentiment analysis
                     
                     # Extract description
-                    desc_tag = item.find("div", attrs={"class": "BNeawe s3v9rd AP7Wnd"})
-                    if desc_tag:
-                        full_text = desc_tag.get_text()
+                    desc_tag = self._select_first(item, self._SEL_DESCRIPTION)
+                    if desc_tag is not None:
+                        full_text = desc_tag.text_content()
                         
                         # Try to extract time and description
                         if "..." in full_text:
@@ -136,21 +220,15 @@ class NewsScraper:
                             description = full_text
                             time_info = ""
                         
-                        news_dict["description"] = description.replace(",", "")
-                        news_dict["time"] = time_info
-                    
-                    # Add source and timestamp
-                    news_dict["source"] = "google_news"
-                    news_dict["scraped_at"] = datetime.now()
+                        news_item.description = description.translate(_STRIP_TABLE)
+                        news_item.time = time_info
                     
                     # Only add if we have at least a title and link
                     # Filter out navigation elements like "Past hour", "Past 24 hours"
-                    if ("title" in news_dict and news_dict["title"] and 
-                        "link" in news_dict and 
-                        "http" in news_dict["link"] and
-                        not any(time_word in news_dict["title"].lower() 
-                               for time_word in ["past hour", "past 24", "past week", "all results"])):
-                        news_list.append(news_dict)
+                    if (news_item.title and
+                        "http" in news_item.link and
+                        not self._NAV_RE.search(news_item.title)):
+                        news_list.append(news_item)
                 
                 except UnicodeEncodeError as e:
                     print(f"Unicode error: {e}")
@@ -167,12 +245,12 @@ class NewsScraper:
             
             # Try to find next page link
             try:
-                next_button = soup.find("a", attrs={"aria-label": "Next page"})
-                if not next_button:
-                    next_button = soup.find("a", attrs={"id": "pnnext"})
+                next_button = self._select_first(tree, self._SEL_NEXT)
+                if next_button is None:
+                    next_button = self._select_first(tree, self._SEL_NEXT_ALT)
                 
-                if next_button and next_button.get("href"):
-                    next_link = self.root + next_button["href"]
+                if next_button is not None and next_button.get("href"):
+                    next_link = self.root + next_button.get("href")
             except Exception as e:
                 print(f"Could not find next page: {e}")
         
@@ -185,6 +263,12 @@ class NewsScraper:
         
         return news_list, next_link
     
+    @staticmethod
+    def _select_first(element, selector: CSSSelector):
+        """Return the first element matching a compiled selector, or None"""
+        matches = selector(element)
+        return matches[0] if matches else None
+    
     def search_news_simple(self, keyword: str, count: int = 20) -> List[Dict]:
         """
         Simplified news search that returns a specific number of articles
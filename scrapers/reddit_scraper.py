@@ -5,8 +5,13 @@ Collects posts and comments from Reddit based on keywords/hashtags
 import praw
 import os
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from contextlib import closing
+from collections import deque
+import pickle
+import sqlite3
+import threading
+import time
 
 load_dotenv()
 
@@ -14,8 +19,36 @@ load_dotenv()
 class RedditScraper:
     """Scrapes Reddit for posts containing specific keywords"""
     
-    def __init__(self):
-        """Initialize Reddit API client with credentials"""
+    # Seconds cached results stay valid, by search time_filter: short windows
+    # change quickly, long ones barely move between runs
+    CACHE_TTL = {
+        'hour': 300,
+        'day': 900,
+        'week': 3600,
+        'month': 6 * 3600,
+        'year': 24 * 3600,
+        'all': 24 * 3600
+    }
+    COMMENTS_CACHE_TTL = 900
+    
+    # Part of every cache key; bump when the cached record format changes
+    # (2: created_utc stored as epoch seconds instead of datetime)
+    CACHE_VERSION = 2
+    
+    # Self-posts longer than this are not searched for the keyword
+    MAX_SELFTEXT_LENGTH = 1_000_000
+    
+    def __init__(self, cache_path: Optional[str] = ".reddit_cache.sqlite"):
+        """
+        Initialize Reddit API client with credentials
+        
+        Args:
+            cache_path: SQLite file for cached results (None disables caching)
+        """
+        # praw.Reddit is not thread-safe and the app shares one scraper
+        # between request threads, so API calls go through this lock
+        self._api_lock = threading.Lock()
+        
         try:
             self.reddit = praw.Reddit(
                 client_id=os.getenv('REDDIT_CLIENT_ID'),
@@ -28,6 +61,50 @@ class RedditScraper:
             print(f"Warning: Reddit API initialization failed: {e}")
             print("Reddit scraping will not be available. Please check your credentials.")
             self.reddit = None
+        
+        # Cache scraped results on disk so repeated searches don't spend
+        # the API rate limit again
+        self.cache_path = cache_path
+        if self.cache_path:
+            try:
+                with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS results "
+                        "(key TEXT PRIMARY KEY, expires REAL, blob BLOB)"
+                    )
+            except sqlite3.Error as e:
+                print(f"Warning: Reddit cache unavailable: {e}")
+                self.cache_path = None
+    
+    def _cache_get(self, key: tuple) -> Optional[List[Dict]]:
+        """Return cached results for key, or None if missing or expired"""
+        if not self.cache_path:
+            return None
+        
+        try:
+            with closing(sqlite3.connect(self.cache_path)) as conn:
+                row = conn.execute(
+                    "SELECT blob FROM results WHERE key = ? AND expires > ?",
+                    (repr((self.CACHE_VERSION, key)), time.time())
+                ).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            print(f"Error reading Reddit cache: {e}")
+            return None
+    
+    def _cache_set(self, key: tuple, results: List[Dict], ttl: int):
+        """Store results for key, valid for ttl seconds"""
+        if not self.cache_path:
+            return
+        
+        try:
+            with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, expires, blob) VALUES (?, ?, ?)",
+                    (repr((self.CACHE_VERSION, key)), time.time() + ttl, pickle.dumps(results))
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing Reddit cache: {e}")
     
     def search_posts(self, keyword: str, limit: int = 100, 
                      subreddit: str = 'all', time_filter: str = 'week') -> List[Dict]:
@@ -41,36 +118,32 @@ class RedditScraper:
             time_filter: Time period ('hour', 'day', 'week', 'month', 'year', 'all')
         
         Returns:
-            List of dictionaries containing post data
+            List of dictionaries containing post data ('created_utc' is
+            epoch seconds as a float)
         """
         if not self.reddit:
             print("Reddit API not initialized. Skipping Reddit scraping.")
             return []
         
+        cache_key = ('search', keyword, subreddit, time_filter, limit)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print(f"Using cached Reddit results for '{keyword}'")
+            return cached
+        
         posts = []
         
         try:
-            subreddit_obj = self.reddit.subreddit(subreddit)
+            with self._api_lock:
+                subreddit_obj = self.reddit.subreddit(subreddit)
+                
+                # Search for posts (the listing itself is fetched up front)
+                submissions = list(subreddit_obj.search(keyword, limit=limit, time_filter=time_filter))
+                posts = self._materialize_all(self._materialize, submissions)
             
-            # Search for posts
-            for submission in subreddit_obj.search(keyword, limit=limit, time_filter=time_filter):
-                try:
-                    post_data = {
-                        'source': 'reddit',
-                        'title': submission.title,
-                        'text': submission.selftext if submission.selftext else '',
-                        'author': str(submission.author) if submission.author else '[deleted]',
-                        'score': submission.score,
-                        'num_comments': submission.num_comments,
-                        'created_utc': datetime.fromtimestamp(submission.created_utc),
-                        'url': f"https://reddit.com{submission.permalink}",
-                        'subreddit': str(submission.subreddit),
-                        'upvote_ratio': submission.upvote_ratio
-                    }
-                    posts.append(post_data)
-                except Exception as e:
-                    print(f"Error processing post: {e}")
-                    continue
+            # Don't cache a partial result set for the whole TTL
+            if len(posts) == len(submissions):
+                self._cache_set(cache_key, posts, self.CACHE_TTL.get(time_filter, 3600))
                     
         except praw.exceptions.PRAWException as e:
             print(f"Reddit API Error: {e}")
@@ -92,37 +165,41 @@ class RedditScraper:
             time_filter: Time period filter
         
         Returns:
-            List of post dictionaries
+            List of post dictionaries ('created_utc' is epoch seconds as a float)
         """
         if not self.reddit:
             return []
         
+        cache_key = ('top', keyword, subreddit, time_filter, limit)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         posts = []
         
         try:
-            subreddit_obj = self.reddit.subreddit(subreddit)
+            with self._api_lock:
+                subreddit_obj = self.reddit.subreddit(subreddit)
+                
+                keyword_folded = keyword.casefold()
+                matches = []
+                for submission in subreddit_obj.top(limit=limit, time_filter=time_filter):
+                    # Check if keyword is in title, only reading selftext if not
+                    matched = keyword_folded in submission.title.casefold()
+                    if not matched:
+                        selftext = submission.selftext
+                        if len(selftext) > self.MAX_SELFTEXT_LENGTH:
+                            continue
+                        matched = bool(selftext) and keyword_folded in selftext.casefold()
+                    
+                    if matched:
+                        matches.append(submission)
+                
+                posts = self._materialize_all(self._materialize, matches)
             
-            for submission in subreddit_obj.top(limit=limit, time_filter=time_filter):
-                # Check if keyword is in title or selftext
-                if keyword.lower() in submission.title.lower() or \
-                   (submission.selftext and keyword.lower() in submission.selftext.lower()):
-                    try:
-                        post_data = {
-                            'source': 'reddit',
-                            'title': submission.title,
-                            'text': submission.selftext if submission.selftext else '',
-                            'author': str(submission.author) if submission.author else '[deleted]',
-                            'score': submission.score,
-                            'num_comments': submission.num_comments,
-                            'created_utc': datetime.fromtimestamp(submission.created_utc),
-                            'url': f"https://reddit.com{submission.permalink}",
-                            'subreddit': str(submission.subreddit),
-                            'upvote_ratio': submission.upvote_ratio
-                        }
-                        posts.append(post_data)
-                    except Exception as e:
-                        print(f"Error processing post: {e}")
-                        continue
+            # Don't cache a partial result set for the whole TTL
+            if len(posts) == len(matches):
+                self._cache_set(cache_key, posts, self.CACHE_TTL.get(time_filter, 3600))
                         
         except praw.exceptions.PRAWException as e:
             print(f"Reddit API Error: {e}")
@@ -140,31 +217,33 @@ class RedditScraper:
             limit: Maximum number of comments
         
         Returns:
-            List of comment dictionaries
+            List of comment dictionaries ('created_utc' is epoch seconds as a float)
         """
         if not self.reddit:
             return []
         
+        cache_key = ('comments', post_url, limit)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         comments = []
         
         try:
-            submission = self.reddit.submission(url=post_url)
-            submission.comments.replace_more(limit=0)
+            with self._api_lock:
+                submission = self.reddit.submission(url=post_url)
+                submission.comments.replace_more(limit=0)
+                
+                parent_post = submission.title
+                items = self._first_comments(submission.comments, limit)
+                comments = self._materialize_all(
+                    lambda comment: self._materialize_comment(comment, parent_post),
+                    items
+                )
             
-            for comment in submission.comments.list()[:limit]:
-                try:
-                    comment_data = {
-                        'source': 'reddit_comment',
-                        'text': comment.body,
-                        'author': str(comment.author) if comment.author else '[deleted]',
-                        'score': comment.score,
-                        'created_utc': datetime.fromtimestamp(comment.created_utc),
-                        'parent_post': submission.title
-                    }
-                    comments.append(comment_data)
-                except Exception as e:
-                    print(f"Error processing comment: {e}")
-                    continue
+            # Don't cache a partial result set for the whole TTL
+            if len(comments) == len(items):
+                self._cache_set(cache_key, comments, self.COMMENTS_CACHE_TTL)
                     
         except praw.exceptions.PRAWException as e:
             print(f"Reddit API Error: {e}")
@@ -172,6 +251,81 @@ class RedditScraper:
             print(f"Unexpected error: {e}")
         
         return comments
+    
+    @staticmethod
+    def _materialize_all(materialize, items: List) -> List[Dict]:
+        """
+        Convert PRAW objects to dictionaries, keeping their order
+        
+        Args:
+            materialize: Function turning one item into a dict (or None on error)
+            items: Submissions or comments to convert
+        
+        Returns:
+            List of dictionaries for the items that converted successfully
+        """
+        return [result for result in map(materialize, items) if result is not None]
+    
+    @staticmethod
+    def _first_comments(forest, limit: int) -> List:
+        """
+        Walk a comment forest breadth-first, stopping after limit comments
+        
+        Gives the same order as forest.list()[:limit] without flattening
+        the whole thread first.
+        
+        Args:
+            forest: PRAW CommentForest (after replace_more)
+            limit: Maximum number of comments
+        
+        Returns:
+            List of comments
+        """
+        comments = []
+        queue = deque(forest)
+        
+        while queue and len(comments) < limit:
+            comment = queue.popleft()
+            comments.append(comment)
+            queue.extend(getattr(comment, 'replies', ()))
+        
+        return comments
+    
+    @staticmethod
+    def _materialize(submission) -> Optional[Dict]:
+        """Build the post dictionary for a submission, or None on error"""
+        try:
+            return {
+                'source': 'reddit',
+                'title': submission.title,
+                'text': submission.selftext if submission.selftext else '',
+                'author': str(submission.author) if submission.author else '[deleted]',
+                'score': submission.score,
+                'num_comments': submission.num_comments,
+                'created_utc': submission.created_utc,  # epoch seconds, converted per column downstream
+                'url': f"https://reddit.com{submission.permalink}",
+                'subreddit': str(submission.subreddit),
+                'upvote_ratio': submission.upvote_ratio
+            }
+        except Exception as e:
+            print(f"Error processing post: {e}")
+            return None
+    
+    @staticmethod
+    def _materialize_comment(comment, parent_post: str) -> Optional[Dict]:
+        """Build the comment dictionary for a comment, or None on error"""
+        try:
+            return {
+                'source': 'reddit_comment',
+                'text': comment.body,
+                'author': str(comment.author) if comment.author else '[deleted]',
+                'score': comment.score,
+                'created_utc': comment.created_utc,  # epoch seconds, converted per column downstream
+                'parent_post': parent_post
+            }
+        except Exception as e:
+            print(f"Error processing comment: {e}")
+            return None
 
 
 def main():
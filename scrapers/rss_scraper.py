@@ -4,22 +4,242 @@ Adapted from Jose-Sabater/marketeer repository
 Scrapes RSS feeds from public news sources
 """
 import feedparser
-from typing import List, Dict
-from datetime import datetime
-import time
+import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from lxml import etree, html
+from io import BytesIO
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import threading
+import re
+
+
+# Email address inside an RSS <author> value such as "jdoe@example.com (Jane Doe)"
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+
+
+def _html_to_text(value: str) -> str:
+    """
+    Reduce an HTML fragment (e.g. an RSS description) to plain text
+    
+    Args:
+        value: Text that may contain markup or character entities
+    
+    Returns:
+        Text content with tags, scripts and styles removed
+    """
+    if not value or ('<' not in value and '&' not in value):
+        return value.strip() if value else ''
+    
+    try:
+        # Parse under a wrapper element so the root is never dropped below
+        fragment = html.fragment_fromstring(value, create_parent='div')
+    except (etree.ParserError, ValueError):
+        return value.strip()
+    
+    for element in fragment.xpath('//script|//style'):
+        element.drop_tree()
+    return ' '.join(fragment.text_content().split())
+
+
+def _author_name(author: str) -> str:
+    """
+    Extract the display name from an RSS author value
+    
+    RSS <author> holds an email address, optionally followed by the name in
+    parentheses; the name is returned when present, otherwise the value.
+    
+    Args:
+        author: Raw author value
+    
+    Returns:
+        Author name, or 'Unknown' if empty
+    """
+    author = (author or '').strip()
+    name = EMAIL_RE.sub('', author).replace('()', '').replace('<>', '').strip(' ()<>')
+    return name or author or 'Unknown'
 
 
 class RSSFeedScraper:
     """Scrapes RSS feeds from various news sources"""
     
-    def __init__(self):
-        """Initialize RSS scraper with default news sources"""
+    def __init__(self, cache_expire_after: int = 900):
+        """
+        Initialize RSS scraper with default news sources
+        
+        Args:
+            cache_expire_after: Seconds a downloaded feed is reused from the
+                                on-disk cache (default: 15 minutes)
+        """
         self.default_feeds = [
             "https://rss.nytimes.com/services/xml/rss/nyt/HomePage.xml",
             "http://feeds.bbci.co.uk/news/rss.xml",
             "https://feeds.reuters.com/reuters/topNews",
             "https://www.theguardian.com/world/rss"
         ]
+        
+        # Feeds are fetched concurrently; cap total workers and the number
+        # of simultaneous requests to any single host
+        self.max_workers = 8
+        self.max_requests_per_host = 2
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+        
+        # Download feeds through an on-disk cache so repeated searches
+        # against the same feeds skip the network. Expired entries with an
+        # ETag/Last-Modified are revalidated with a conditional request
+        self.session = requests_cache.CachedSession(
+            cache_name=".rss_cache",
+            backend="sqlite",
+            expire_after=cache_expire_after,
+            allowable_methods=("GET",)
+        )
+        
+        # One keep-alive pool slot per concurrent feed worker
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    
+    def _download_feed(self, feed_url: str) -> requests.Response:
+        """
+        Download a feed through the cached session
+        
+        Args:
+            feed_url: URL of the RSS feed
+        
+        Returns:
+            HTTP response with the raw feed bytes
+        """
+        with self._host_limit(feed_url):
+            response = self.session.get(feed_url, timeout=10)
+        response.raise_for_status()
+        return response
+    
+    def _parse_feed(self, response: requests.Response) -> feedparser.FeedParserDict:
+        """
+        Parse a downloaded feed with feedparser
+        
+        Args:
+            response: HTTP response returned by _download_feed
+        
+        Returns:
+            Parsed feed
+        """
+        # Pass the response headers so feedparser can still detect the
+        # encoding and resolve relative links
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        headers['content-location'] = response.url
+        return feedparser.parse(response.content, response_headers=headers)
+    
+    def _fetch_feed(self, feed_url: str) -> feedparser.FeedParserDict:
+        """
+        Download a feed through the cached session and parse it
+        
+        Args:
+            feed_url: URL of the RSS feed
+        
+        Returns:
+            Parsed feed
+        """
+        return self._parse_feed(self._download_feed(feed_url))
+    
+    def _stream_feed(self, content: bytes, feed_url: str, keyword: str,
+                     limit: int) -> Optional[List[Dict]]:
+        """
+        Incrementally parse RSS <item> elements and keep those matching keyword
+        
+        Only the first `limit` items are examined (the same window as
+        feed.entries[:limit]), and each item is discarded once read, so memory
+        stays flat regardless of feed size.
+        
+        Args:
+            content: Raw feed bytes
+            feed_url: URL of the RSS feed
+            keyword: Keyword to filter articles
+            limit: Maximum number of items to examine
+        
+        Returns:
+            List of matching article dictionaries, or None if the document
+            has no RSS items (e.g. an Atom feed) and needs feedparser
+        """
+        articles = []
+        keyword_lower = keyword.lower()
+        scraped_at = datetime.now()
+        seen = 0
+        
+        if limit <= 0:
+            return articles
+        
+        items = etree.iterparse(BytesIO(content), events=("end",), tag="{*}item",
+                                resolve_entities=False, no_network=True)
+        
+        for _, item in items:
+            seen += 1
+            
+            # Map child local names (title, pubDate, dc:creator, ...) to their
+            # full text, including any nested elements; plain RSS elements win
+            # over namespaced ones like atom:link
+            fields = {}
+            for child in item:
+                if not isinstance(child.tag, str):
+                    continue
+                name = etree.QName(child)
+                if name.namespace is None or name.localname not in fields:
+                    fields[name.localname] = ''.join(child.itertext()).strip()
+            
+            # Titles and descriptions are often escaped HTML or CDATA
+            title = _html_to_text(fields.get('title', ''))
+            description = _html_to_text(fields.get('description', ''))
+            
+            if keyword_lower in title.lower() or keyword_lower in description.lower():
+                published = fields.get('pubDate', '')
+                articles.append({
+                    'source': 'rss_feed',
+                    'feed_url': feed_url,
+                    'title': title,
+                    'description': description,
+                    'link': fields.get('link', ''),
+                    'published': published,
+                    'author': _author_name(fields.get('author') or fields.get('creator')),
+                    'scraped_at': scraped_at,
+                    'published_date': self._parse_pub_date(published)
+                })
+            
+            # Free the processed item and any siblings already read
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+            
+            if seen >= limit:
+                break
+        
+        return articles if seen else None
+    
+    @staticmethod
+    def _parse_pub_date(published: str) -> Optional[datetime]:
+        """Parse an RFC 822 pubDate into a naive UTC datetime (like feedparser)"""
+        if not published:
+            return None
+        try:
+            parsed = parsedate_to_datetime(published)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    def _host_limit(self, feed_url: str) -> threading.Semaphore:
+        """Get the semaphore limiting concurrent requests to a feed's host"""
+        host = urlparse(feed_url).netloc
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.max_requests_per_host)
+            return self._host_limits[host]
     
     def scrape_feed(self, feed_url: str, keyword: str = None, limit: int = 50) -> List[Dict]:
         """
@@ -37,24 +257,39 @@ class RSSFeedScraper:
         
         try:
             print(f"Scraping RSS feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
+            response = self._download_feed(feed_url)
+            
+            # With a keyword most entries are rejected, so stream the XML
+            # instead of building every entry with feedparser
+            if keyword:
+                try:
+                    streamed = self._stream_feed(response.content, feed_url, keyword, limit)
+                    if streamed is not None:
+                        return streamed
+                except etree.XMLSyntaxError as e:
+                    print(f"Streaming parse failed for {feed_url}, using feedparser: {e}")
+            
+            feed = self._parse_feed(response)
             
             # Check if feed was parsed successfully
             if feed.bozo:
                 print(f"Warning: Feed may have parsing issues: {feed_url}")
             
+            # All entries in a feed share one scrape timestamp
+            scraped_at = datetime.now()
+            
             for entry in feed.entries[:limit]:
                 try:
                     # Extract article data
                     article = {
                         'source': 'rss_feed',
                         'feed_url': feed_url,
-                        'title': entry.get('title', ''),
-                        'description': entry.get('summary', '').strip(),
+                        'title': _html_to_text(entry.get('title', '')),
+                        'description': _html_to_text(entry.get('summary', '')),
                         'link': entry.get('link', ''),
                         'published': entry.get('published', ''),
-                        'author': entry.get('author', 'Unknown'),
-                        'scraped_at': datetime.now()
+                        'author': _author_name(entry.get('author')),
+                        'scraped_at': scraped_at
                     }
                     
                     # Try to parse publication date
@@ -108,17 +343,23 @@ class RSSFeedScraper:
         """
         all_articles = []
         
-        for feed_url in feed_urls:
-            try:
-                articles = self.scrape_feed(feed_url, keyword, limit_per_feed)
-                all_articles.extend(articles)
-                
-                # Be polite - add small delay between requests
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"Error scraping feed {feed_url}: {e}")
-                continue
+        if not feed_urls:
+            return all_articles
+        
+        # Fetch feeds concurrently; feeds sharing a host are throttled
+        # by the per-host limit in scrape_feed
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(feed_urls))) as executor:
+            futures = [
+                executor.submit(self.scrape_feed, feed_url, keyword, limit_per_feed)
+                for feed_url in feed_urls
+            ]
+            
+            for feed_url, future in zip(feed_urls, futures):
+                try:
+                    all_articles.extend(future.result())
+                except Exception as e:
+                    print(f"Error scraping feed {feed_url}: {e}")
+                    continue
         
         print(f"Total articles scraped from RSS feeds: {len(all_articles)}")
         return all_articles
@@ -147,7 +388,7 @@ class RSSFeedScraper:
             Dictionary with feed metadata
         """
         try:
-            feed = feedparser.parse(feed_url)
+            feed = self._fetch_feed(feed_url)
             
             feed_info = {
                 'title': feed.feed.get('title', 'Unknown'),
@@ -3,19 +3,76 @@ Sentiment Analysis Module
 Uses TextBlob and VADER to analyze sentiment of text data
 Adapted from Jose-Sabater/marketeer repository
 """
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 import numpy as np
+import functools
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Order of the VADER scores in batch arrays and the column suffixes they map to
+VADER_KEYS = ('pos', 'neu', 'neg', 'compound')
+SCORE_SUFFIXES = ('positive', 'neutral', 'negative', 'compound')
+
+# Scores for empty, whitespace-only or non-string input
+NEUTRAL_SCORES = (0.0, 1.0, 0.0, 0.0)
+
+# VADER slows down sharply on very long or emoji-heavy texts, so longer
+# texts are truncated and emoji floods are stripped before scoring
+MAX_TEXT_LENGTH = 5000
+MAX_EMOJIS = 50
+EMOJI_RE = re.compile('[\U0001F300-\U0001FAFF\u2600-\u27BF]')
+
+# Batches with fewer distinct texts than this are scored in-process, since
+# starting worker processes costs more than it saves
+PARALLEL_MIN_TEXTS = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_vader():
+    """
+    VADER analyzer shared by every SentimentAnalyzer in the process
+    
+    VADER loads its ~7500-entry lexicon from disk on construction and keeps
+    no per-call state, so it is imported and built once, on first use.
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
 
 
 class SentimentAnalyzer:
     """Analyzes sentiment using multiple methods"""
     
-    def __init__(self):
-        """Initialize sentiment analyzers"""
-        self.vader = SentimentIntensityAnalyzer()
+    def __init__(self, cache_size: int = 50000, n_workers: int = 1):
+        """
+        Initialize sentiment analyzers
+        
+        Args:
+            cache_size: Number of distinct texts whose VADER scores are cached
+            n_workers: Worker processes for scoring large batches (1 scores
+                       everything in the current process)
+        """
+        self.n_workers = n_workers
+        # Headlines are often syndicated across sources, so cache scores by text
+        self._score = functools.lru_cache(maxsize=cache_size)(self._score_text)
+    
+    @functools.cached_property
+    def vader(self):
+        """Shared VADER analyzer, imported and loaded on first use"""
+        return _shared_vader()
+    
+    @functools.cached_property
+    def _blobber(self):
+        """
+        TextBlob Blobber, imported and built on first use
+        
+        One Blobber shares its tokenizer and sentiment analyzer across texts
+        instead of each TextBlob building its own.
+        """
+        from textblob import Blobber
+        from textblob.sentiments import PatternAnalyzer
+        return Blobber(analyzer=PatternAnalyzer())
     
     def analyze_vader(self, text: str) -> Dict[str, float]:
         """
@@ -27,15 +84,11 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment scores
         """
-        if not text or not isinstance(text, str):
-            return {'pos': 0.0, 'neu': 1.0, 'neg': 0.0, 'compound': 0.0}
+        if not isinstance(text, str) or not text or text.isspace():
+            return dict(zip(VADER_KEYS, NEUTRAL_SCORES))
         
-        try:
-            scores = self.vader.polarity_scores(text)
-            return scores
-        except Exception as e:
-            print(f"Error in VADER analysis: {e}")
-            return {'pos': 0.0, 'neu': 1.0, 'neg': 0.0, 'compound': 0.0}
+        # Scores are cached as tuples; build the dict only for the caller
+        return dict(zip(VADER_KEYS, self._score(text)))
     
     def analyze_textblob(self, text: str) -> Dict[str, float]:
         """
@@ -47,19 +100,32 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with polarity and subjectivity scores
         """
-        if not text or not isinstance(text, str):
+        if not isinstance(text, str) or not text or text.isspace():
             return {'polarity': 0.0, 'subjectivity': 0.0}
         
         try:
-            blob = TextBlob(text)
+            sentiment = self._blobber(text).sentiment
             return {
-                'polarity': blob.sentiment.polarity,
-                'subjectivity': blob.sentiment.subjectivity
+                'polarity': sentiment.polarity,
+                'subjectivity': sentiment.subjectivity
             }
         except Exception as e:
             print(f"Error in TextBlob analysis: {e}")
             return {'polarity': 0.0, 'subjectivity': 0.0}
     
+    def analyze_textblob_many(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Analyze sentiment using TextBlob for a batch of texts
+        
+        Args:
+            texts: List of text strings
+        
+        Returns:
+            List of dictionaries with polarity and subjectivity scores
+        """
+        analyze = self.analyze_textblob
+        return [analyze(text) for text in texts]
+    
     def analyze_combined(self, text: str) -> Dict[str, float]:
         """
         Analyze using both VADER and TextBlob
@@ -125,77 +191,161 @@ class SentimentAnalyzer:
         
         return pd.DataFrame(results)
     
-    def analyze_data_with_sentiment(self, data: List[Dict], 
+    def score_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Analyze VADER sentiment for a batch of texts
+        
+        Args:
+            texts: List (or object array) of text strings
+        
+        Returns:
+            Array of shape (len(texts), 4) with pos, neu, neg and compound scores
+        """
+        # Score each distinct text once, then gather back to the input order
+        unique, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+        
+        unique_scores = None
+        if self.n_workers > 1 and len(unique) >= PARALLEL_MIN_TEXTS:
+            unique_scores = self._score_parallel(unique)
+        
+        if unique_scores is None:
+            unique_scores = np.empty((len(unique), len(VADER_KEYS)), dtype=np.float64)
+            score = self._score
+            for i, text in enumerate(unique):
+                unique_scores[i] = score(text)
+        
+        return unique_scores[inverse.ravel()]
+    
+    def _score_parallel(self, texts: np.ndarray) -> np.ndarray:
+        """
+        Score texts across worker processes (VADER is CPU-bound pure Python)
+        
+        Args:
+            texts: Object array of distinct text strings
+        
+        Returns:
+            Array of shape (len(texts), 4), or None if the pool failed
+        """
+        chunks = np.array_split(texts, self.n_workers)
+        
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                return np.vstack(list(executor.map(_score_chunk, chunks)))
+        except Exception as e:
+            print(f"Parallel sentiment scoring failed, scoring serially: {e}")
+            return None
+    
+    def _score_text(self, text: str) -> Tuple[float, float, float, float]:
+        """VADER scores for a single text as a (pos, neu, neg, compound) tuple"""
+        if not text or text.isspace():
+            return NEUTRAL_SCORES
+        
+        try:
+            result = self.vader.polarity_scores(self._limit_text(text))
+            return tuple(result[key] for key in VADER_KEYS)
+        except Exception as e:
+            print(f"Error in VADER analysis: {e}")
+            return NEUTRAL_SCORES
+    
+    @staticmethod
+    def _limit_text(text: str) -> str:
+        """Bound the length and emoji count of a text before VADER scoring"""
+        if len(text) > MAX_TEXT_LENGTH:
+            # Cut at the last word boundary so no partial word is scored
+            cut = text.rfind(' ', 0, MAX_TEXT_LENGTH)
+            text = text[:cut if cut > 0 else MAX_TEXT_LENGTH]
+        
+        stripped, emoji_count = EMOJI_RE.subn('', text)
+        if emoji_count > MAX_EMOJIS:
+            print(f"Stripped {emoji_count} emojis from text before VADER analysis")
+            text = stripped
+        
+        return text
+    
+    def _score_column(self, column: pd.Series) -> np.ndarray:
+        """VADER scores for a DataFrame column as a (n, 4) array, mapping NaN to ''"""
+        return self.score_texts(column.fillna('').astype(str).to_numpy(dtype=object))
+    
+    @staticmethod
+    def _assign_scores(df: pd.DataFrame, prefix: str, scores: np.ndarray):
+        """Write a (n, 4) score array into the prefix_positive/... columns at once"""
+        df[[f'{prefix}_{suffix}' for suffix in SCORE_SUFFIXES]] = scores
+    
+    def analyze_data_with_sentiment(self, data: Union[List[Dict], Dict[str, List], pd.DataFrame],
                                    text_field: str = 'text',
-                                   title_field: str = 'title') -> pd.DataFrame:
+                                   title_field: str = 'title',
+                                   fused: bool = False) -> pd.DataFrame:
         """
         Analyze sentiment for data with title and text fields
         
         Args:
-            data: List of dictionaries containing text data
+            data: List of dictionaries, dictionary of column lists, or
+                  DataFrame containing text data
             text_field: Field name containing main text
             title_field: Field name containing title
+            fused: Score title and text joined together in one VADER call
+                   per row, filling only the avg_* columns (about half the
+                   work when separate title_*/text_* scores aren't needed)
         
         Returns:
             DataFrame with original data and sentiment scores
         """
-        df = pd.DataFrame(data)
+        if isinstance(data, pd.DataFrame):
+            # Score columns are added to a shallow copy, leaving the
+            # caller's frame untouched without copying its data
+            df = data.copy(deep=False)
+        else:
+            df = pd.DataFrame(data)
         
         if df.empty:
             return df
         
-        # Analyze title if present
-        if title_field in df.columns:
-            print("Analyzing title sentiment...")
-            title_sentiments = []
-            for title in df[title_field]:
-                if pd.isna(title):
-                    title = ""
-                scores = self.analyze_vader(str(title))
-                title_sentiments.append(scores)
+        title_scores = None
+        text_scores = None
+        
+        if fused and title_field in df.columns and text_field in df.columns:
+            print("Analyzing combined title and text sentiment...")
+            titles = df[title_field].fillna('').astype(str)
+            texts = df[text_field].fillna('').astype(str)
             
-            title_df = pd.DataFrame(title_sentiments)
-            df['title_positive'] = title_df['pos']
-            df['title_neutral'] = title_df['neu']
-            df['title_negative'] = title_df['neg']
-            df['title_compound'] = title_df['compound']
-        
-        # Analyze text/description if present
-        if text_field in df.columns:
-            print("Analyzing text sentiment...")
-            text_sentiments = []
-            for text in df[text_field]:
-                if pd.isna(text):
-                    text = ""
-                scores = self.analyze_vader(str(text))
-                text_sentiments.append(scores)
+            # Join both parts, or use whichever is set when one is empty or
+            # the text just repeats the title
+            combined = (titles + '. ' + texts).where(
+                titles.ne('') & texts.ne('') & titles.ne(texts),
+                titles.where(titles.ne(''), texts)
+            )
+            self._assign_scores(df, 'avg', self._score_column(combined))
+        
+        else:
+            # Analyze title if present
+            if title_field in df.columns:
+                print("Analyzing title sentiment...")
+                title_scores = self._score_column(df[title_field])
+                self._assign_scores(df, 'title', title_scores)
+            
+            # Analyze text/description if present
+            if text_field in df.columns:
+                print("Analyzing text sentiment...")
+                text_scores = self._score_column(df[text_field])
+                self._assign_scores(df, 'text', text_scores)
             
-            text_df = pd.DataFrame(text_sentiments)
-            df['text_positive'] = text_df['pos']
-            df['text_neutral'] = text_df['neu']
-            df['text_negative'] = text_df['neg']
-            df['text_compound'] = text_df['compound']
-        
-        # Calculate average sentiment if both title and text exist
-        if title_field in df.columns and text_field in df.columns:
-            df['avg_positive'] = (df['title_positive'] + df['text_positive']) / 2
-            df['avg_neutral'] = (df['title_neutral'] + df['text_neutral']) / 2
-            df['avg_negative'] = (df['title_negative'] + df['text_negative']) / 2
-            df['avg_compound'] = (df['title_compound'] + df['text_compound']) / 2
-        elif title_field in df.columns:
-            df['avg_positive'] = df['title_positive']
-            df['avg_neutral'] = df['title_neutral']
-            df['avg_negative'] = df['title_negative']
-            df['avg_compound'] = df['title_compound']
-        elif text_field in df.columns:
-            df['avg_positive'] = df['text_positive']
-            df['avg_neutral'] = df['text_neutral']
-            df['avg_negative'] = df['text_negative']
-            df['avg_compound'] = df['text_compound']
+            # Calculate average sentiment if both title and text exist
+            if title_scores is not None and text_scores is not None:
+                self._assign_scores(df, 'avg', (title_scores + text_scores) * 0.5)
+            elif title_scores is not None:
+                self._assign_scores(df, 'avg', title_scores)
+            elif text_scores is not None:
+                self._assign_scores(df, 'avg', text_scores)
         
         # Categorize overall sentiment
         if 'avg_compound' in df.columns:
-            df['sentiment'] = df['avg_compound'].apply(self.categorize_sentiment)
+            # Same thresholds as categorize_sentiment, applied to the whole column
+            compound = df['avg_compound'].to_numpy()
+            df['sentiment'] = np.select(
+                [compound >= 0.05, compound <= -0.05],
+                ['positive', 'negative'],
+                default='neutral'
+            )
         
         return df
     
@@ -212,16 +362,21 @@ class SentimentAnalyzer:
         if df.empty or 'avg_compound' not in df.columns:
             return {}
         
+        # Count all categories in a single pass
+        counts = df['sentiment'].value_counts()
+        
+        # Average all score columns in one call
+        mean_columns = ['avg_compound', 'avg_positive', 'avg_neutral', 'avg_negative']
+        means = df[mean_columns].mean()
+        
         summary = {
             'total_items': len(df),
-            'positive_count': len(df[df['sentiment'] == 'positive']),
-            'negative_count': len(df[df['sentiment'] == 'negative']),
-            'neutral_count': len(df[df['sentiment'] == 'neutral']),
-            'avg_compound': float(df['avg_compound'].mean()),
-            'avg_positive': float(df['avg_positive'].mean()),
-            'avg_neutral': float(df['avg_neutral'].mean()),
-            'avg_negative': float(df['avg_negative'].mean()),
+            'positive_count': int(counts.get('positive', 0)),
+            'negative_count': int(counts.get('negative', 0)),
+            'neutral_count': int(counts.get('neutral', 0)),
         }
+        for column in mean_columns:
+            summary[column] = float(means[column])
         
         # Calculate percentages
         if summary['total_items'] > 0:
@@ -232,6 +387,18 @@ class SentimentAnalyzer:
         return summary
 
 
+# Analyzer used inside worker processes, created on first use in each worker
+_worker_analyzer = None
+
+
+def _score_chunk(texts: np.ndarray) -> np.ndarray:
+    """Score one chunk of texts in a worker process (module-level so it pickles)"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = SentimentAnalyzer()
+    return _worker_analyzer.score_texts(texts)
+
+
 def main():
     """Test the sentiment analyzer"""
     analyzer = SentimentAnalyzer()
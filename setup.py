@@ -5,6 +5,7 @@ Downloads required NLTK data and creates necessary directories
 import os
 import nltk
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 
 def setup_directories():
@@ -20,27 +21,41 @@ def setup_directories():
         print(f"✓ Created directory: {directory}")
 
 
-def download_nltk_data():
-    """Download required NLTK data"""
-    print("\nDownloading NLTK data...")
+# (package name, resource path checked before downloading, display name)
+NLTK_RESOURCES = [
+    ('vader_lexicon', 'sentiment/vader_lexicon.zip', 'VADER lexicon'),
+    ('punkt', 'tokenizers/punkt', 'punkt tokenizer'),
+    ('averaged_perceptron_tagger', 'taggers/averaged_perceptron_tagger', 'POS tagger'),
+]
+
+
+def _ensure_nltk_resource(resource):
+    """Download an NLTK resource unless it is already installed"""
+    package, path, label = resource
     
     try:
-        nltk.download('vader_lexicon', quiet=True)
-        print("✓ Downloaded VADER lexicon")
-    except Exception as e:
-        print(f"✗ Error downloading VADER lexicon: {e}")
+        nltk.data.find(path)
+        print(f"✓ {label} already installed")
+        return
+    except LookupError:
+        pass
     
     try:
-        nltk.download('punkt', quiet=True)
-        print("✓ Downloaded punkt tokenizer")
+        if nltk.download(package, quiet=True):
+            print(f"✓ Downloaded {label}")
+        else:
+            print(f"✗ Error downloading {label}")
     except Exception as e:
-        print(f"✗ Error downloading punkt: {e}")
+        print(f"✗ Error downloading {label}: {e}")
+
+
+def download_nltk_data():
+    """Download required NLTK data"""
+    print("\nDownloading NLTK data...")
     
-    try:
-        nltk.download('averaged_perceptron_tagger', quiet=True)
-        print("✓ Downloaded POS tagger")
-    except Exception as e:
-        print(f"✗ Error downloading POS tagger: {e}")
+    # The downloads are independent, so fetch any missing ones in parallel
+    with ThreadPoolExecutor(max_workers=len(NLTK_RESOURCES)) as executor:
+        list(executor.map(_ensure_nltk_resource, NLTK_RESOURCES))
 
 
 def check_env_file():
@@ -69,7 +84,8 @@ def verify_dependencies():
         ('flask', 'Flask'),
         ('pandas', 'Pandas'),
         ('matplotlib', 'Matplotlib'),
-        ('bs4', 'BeautifulSoup'),
+        ('lxml', 'lxml'),
+        ('cssselect', 'cssselect'),
         ('praw', 'PRAW'),
         ('feedparser', 'Feedparser'),
         ('textblob', 'TextBlob'),
@@ -0,0 +1,40 @@
+"""
+Tests for the chart helpers
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+
+from visualization.charts import SentimentVisualizer
+
+
+def assert_matches_numpy(values, bins=30):
+    counts, edges = SentimentVisualizer._histogram(values, bins)
+    expected_counts, expected_edges = np.histogram(values, bins=bins)
+    np.testing.assert_array_equal(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected_counts)
+
+
+@pytest.mark.parametrize("value", [-1.0, -0.3, 0.0, 0.3, 1.0])
+def test_histogram_constant_values(value):
+    assert_matches_numpy(np.full(25, value))
+
+
+def test_histogram_values_on_bin_edges():
+    # Every edge of the range's own bins, plus the maximum
+    values = np.linspace(-1.0, 1.0, 31)
+    assert_matches_numpy(values)
+    assert_matches_numpy(np.repeat(values, 3))
+
+
+def test_histogram_rounded_scores():
+    # VADER compound scores have four decimals, so many land on edges
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        values = np.round(rng.uniform(-1, 1, size=rng.integers(1, 200)), 4)
+        assert_matches_numpy(values)
+
+
+def test_histogram_empty():
+    assert_matches_numpy(np.array([], dtype=float))
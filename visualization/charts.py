@@ -5,30 +5,202 @@ Creates charts and graphs for sentiment analysis results
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for web
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
 import seaborn as sns
 import pandas as pd
 import numpy as np
 from typing import Dict, List
 import os
+import gc
+import tempfile
+import hashlib
+import threading
+from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Resolution of saved charts; 100 dpi is sharp enough for web charts
+CHART_DPI = 100
+
+# Fixed subplot margins (figure fractions) used instead of tight_layout;
+# the time series needs room for rotated dates, the source chart for the
+# source names on its y axis
+CHART_MARGINS = {'left': 0.10, 'right': 0.97, 'top': 0.90, 'bottom': 0.14}
+TIME_SERIES_MARGINS = {**CHART_MARGINS, 'bottom': 0.20}
+SOURCE_MARGINS = {**CHART_MARGINS, 'left': 0.18}
+
+# Summary entries and DataFrame columns the dashboard charts are drawn from
+CHART_SUMMARY_KEYS = ('positive_count', 'negative_count', 'neutral_count')
+CHART_COLUMNS = ('avg_compound', 'source', 'created_utc')
+
+# Part of every chart content key; bump whenever chart code or styling
+# changes so charts rendered by older code on disk are not reused
+RENDER_VERSION = 1
+
+# Time series with more than MAX_MARKER_POINTS rows are plotted as a daily
+# mean trend without markers (at most one point per day)
+MAX_MARKER_POINTS = 500
+
+# Charts with only a handful of artists are saved as SVG: a few kilobytes of
+# XML that is faster to write than a raster encode and stays sharp at any zoom
+VECTOR_CHARTS = ('pie_chart', 'bar_chart', 'source_comparison')
+
+
+# Set once _apply_style has configured the global matplotlib/seaborn style
+_STYLE_APPLIED = False
+
+
+def _apply_style():
+    """Apply the chart style to the global rcParams, once per process"""
+    global _STYLE_APPLIED
+    if _STYLE_APPLIED:
+        return
+    
+    sns.set_style("whitegrid")
+    plt.rcParams.update({
+        'figure.figsize': (10, 6),
+        'savefig.dpi': CHART_DPI,
+        # Draw long line plots in chunks instead of one huge path
+        'agg.path.chunksize': 10000
+    })
+    _STYLE_APPLIED = True
 
 
 class SentimentVisualizer:
     """Creates visualizations for sentiment analysis data"""
     
-    def __init__(self, output_dir: str = "static/images/charts"):
+    def __init__(self, output_dir: str = "static/images/charts", image_format: str = 'jpg'):
         """
         Initialize visualizer
         
         Args:
             output_dir: Directory to save chart images
+            image_format: Raster chart file format, 'jpg' (default) or 'png'
+                (VECTOR_CHARTS are always SVG)
         """
         self.output_dir = output_dir
+        # Output directory with a trailing separator, so paths are one concat
+        self._dir = os.path.join(output_dir, '')
+        self.image_format = 'jpg' if image_format.lower() in ('jpg', 'jpeg') else 'png'
+        
+        # Charts render on a small persistent pool; each worker thread keeps
+        # its own reusable figures (see _get_axes)
+        self._executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="charts")
+        self._local = threading.local()
         os.makedirs(output_dir, exist_ok=True)
         
         # Set style
-        sns.set_style("whitegrid")
-        plt.rcParams['figure.figsize'] = (10, 6)
+        _apply_style()
+        
+        # Pillow encoder options (see _save). None of the charts need
+        # transparency, so JPEG (much faster to encode and smaller) is the
+        # default; PNG uses fast deflate
+        if self.image_format == 'jpg':
+            self._save_kwargs = {'format': 'JPEG', 'quality': 85, 'optimize': False, 'progressive': False}
+        else:
+            self._save_kwargs = {'format': 'PNG', 'compress_level': 1, 'optimize': False}
+    
+    def _get_axes(self, figsize=(10, 6), margins: Dict = None):
+        """
+        Get a cleared, reusable figure and axes of the given size
+        
+        Figures are created once per size and thread (outside pyplot, so
+        nothing has to be closed) and cleared between charts instead of
+        rebuilt. Figures are never shared between threads.
+        
+        Args:
+            figsize: Figure size in inches
+            margins: subplots_adjust margins (CHART_MARGINS if None)
+        
+        Returns:
+            Tuple of (figure, axes)
+        """
+        figures = getattr(self._local, 'figures', None)
+        if figures is None:
+            figures = self._local.figures = {}
+        
+        fig = figures.get(figsize)
+        if fig is None:
+            fig = Figure(figsize=figsize, dpi=CHART_DPI, facecolor='white')
+            FigureCanvasAgg(fig)
+            fig.add_subplot()
+            figures[figsize] = fig
+        
+        fig.subplots_adjust(**(margins or CHART_MARGINS))
+        ax = fig.axes[0]
+        ax.clear()
+        # clear() keeps axes-level state the pie chart changes, so undo its
+        # equal aspect and hidden frame
+        ax.set_aspect('auto')
+        ax.set_frame_on(True)
+        return fig, ax
+    
+    def _save(self, fig: Figure, filepath: str):
+        """
+        Render a figure and encode it straight from the Agg pixel buffer
+        
+        Paths ending in .svg are written as vector SVG instead.
+        
+        Args:
+            fig: Figure to save
+            filepath: Output path
+        """
+        if filepath.endswith('.svg'):
+            buffer = BytesIO()
+            fig.savefig(buffer, format='svg')
+            self._write(filepath, buffer)
+            return
+        
+        fig.canvas.draw()
+        
+        # The figure background is opaque white, so the alpha channel
+        # carries nothing and is dropped before encoding
+        image = Image.fromarray(np.asarray(fig.canvas.buffer_rgba())).convert('RGB')
+        
+        # Encode in memory and write the file with a single call
+        buffer = BytesIO()
+        image.save(buffer, **self._save_kwargs)
+        self._write(filepath, buffer)
+    
+    @staticmethod
+    def _write(filepath: str, buffer: BytesIO):
+        """
+        Atomically write an encoded chart to filepath
+        
+        The data goes to a temporary file in the same directory that is then
+        renamed into place, so concurrent renders of the same chart never
+        leave a half-written file behind.
+        
+        Args:
+            filepath: Output path
+            buffer: Encoded chart
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(buffer.getbuffer())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def _path(self, filename: str, prefix: str, ext: str = None) -> str:
+        """
+        Build the output path for a chart
+        
+        Args:
+            filename: Output filename (None for a timestamped default)
+            prefix: Prefix of the default filename
+            ext: Extension of the default filename (image_format if None)
+        
+        Returns:
+            Path inside the output directory
+        """
+        if not filename:
+            filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext or self.image_format}"
+        return self._dir + filename
     
     def create_sentiment_pie_chart(self, summary: Dict, filename: str = None) -> str:
         """
@@ -41,10 +213,7 @@ class SentimentVisualizer:
         Returns:
             Path to saved image
         """
-        if not filename:
-            filename = f"sentiment_pie_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self._path(filename, "sentiment_pie", 'svg')
         
         # Extract data
         labels = ['Positive', 'Negative', 'Neutral']
@@ -54,18 +223,20 @@ class SentimentVisualizer:
             summary.get('neutral_count', 0)
         ]
         colors = ['#4CAF50', '#F44336', '#9E9E9E']
-        explode = (0.1, 0.1, 0)
+        
+        # Put the percentages in the labels up front rather than drawing a
+        # separate autopct text artist (and shadow patch) per wedge
+        total = sum(sizes) or 1
+        labels = [f'{label}\n{size / total * 100:.1f}%' for label, size in zip(labels, sizes)]
         
         # Create pie chart
-        fig, ax = plt.subplots()
-        ax.pie(sizes, explode=explode, labels=labels, colors=colors,
-               autopct='%1.1f%%', shadow=True, startangle=90)
+        fig, ax = self._get_axes()
+        ax.pie(sizes, labels=labels, colors=colors, startangle=90,
+               wedgeprops={'linewidth': 0.5, 'edgecolor': 'white'})
         ax.axis('equal')
         
-        plt.title('Sentiment Distribution', fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        ax.set_title('Sentiment Distribution', fontsize=16, fontweight='bold')
+        self._save(fig, filepath)
         
         return filepath
     
@@ -80,10 +251,7 @@ class SentimentVisualizer:
         Returns:
             Path to saved image
         """
-        if not filename:
-            filename = f"sentiment_bar_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self._path(filename, "sentiment_bar", 'svg')
         
         # Prepare data
         sentiments = ['Positive', 'Negative', 'Neutral']
@@ -95,7 +263,7 @@ class SentimentVisualizer:
         colors = ['#4CAF50', '#F44336', '#9E9E9E']
         
         # Create bar chart
-        fig, ax = plt.subplots()
+        fig, ax = self._get_axes()
         bars = ax.bar(sentiments, counts, color=colors, alpha=0.7, edgecolor='black')
         
         # Add value labels on bars
@@ -109,9 +277,7 @@ class SentimentVisualizer:
         ax.set_title('Sentiment Analysis Results', fontsize=16, fontweight='bold')
         ax.set_ylim(0, max(counts) * 1.15 if max(counts) > 0 else 10)
         
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(fig, filepath)
         
         return filepath
     
@@ -126,46 +292,66 @@ class SentimentVisualizer:
         Returns:
             Path to saved image
         """
-        if not filename:
-            filename = f"score_dist_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self._path(filename, "score_dist")
         
         if df.empty or 'avg_compound' not in df.columns:
             # Create empty plot
-            fig, ax = plt.subplots()
+            fig, ax = self._get_axes()
             ax.text(0.5, 0.5, 'No data available', 
                    ha='center', va='center', fontsize=14)
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            plt.close()
+            self._save(fig, filepath)
             return filepath
         
         # Create histogram
-        fig, ax = plt.subplots()
+        fig, ax = self._get_axes()
         
-        n, bins, patches = ax.hist(df['avg_compound'], bins=30, 
-                                   edgecolor='black', alpha=0.7)
+        values = df['avg_compound'].dropna().to_numpy(dtype=float)
+        n, bins = self._histogram(values, bins=30)
         
-        # Color bars based on sentiment
-        for i, patch in enumerate(patches):
-            if bins[i] < -0.05:
-                patch.set_facecolor('#F44336')  # Red for negative
-            elif bins[i] > 0.05:
-                patch.set_facecolor('#4CAF50')  # Green for positive
-            else:
-                patch.set_facecolor('#9E9E9E')  # Gray for neutral
+        # Color bars based on sentiment: red negative, green positive, gray neutral
+        left = bins[:-1]
+        colors = np.where(left < -0.05, '#F44336',
+                          np.where(left > 0.05, '#4CAF50', '#9E9E9E'))
+        
+        ax.bar(left, n, width=np.diff(bins), align='edge', color=colors,
+               edgecolor='black', alpha=0.7)
         
         ax.axvline(x=0, color='black', linestyle='--', linewidth=1, alpha=0.5)
         ax.set_xlabel('Compound Sentiment Score', fontsize=12, fontweight='bold')
         ax.set_ylabel('Frequency', fontsize=12, fontweight='bold')
         ax.set_title('Distribution of Sentiment Scores', fontsize=16, fontweight='bold')
         
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(fig, filepath)
         
         return filepath
     
+    @staticmethod
+    def _histogram(values: np.ndarray, bins: int):
+        """
+        Count values into uniform bins spanning their range
+        
+        Args:
+            values: 1-D array of finite values
+            bins: Number of bins
+        
+        Returns:
+            Tuple of (counts, bin edges), identical to np.histogram's
+        """
+        if len(values) == 0:
+            return np.histogram(values, bins=bins)
+        
+        lo, hi = float(values.min()), float(values.max())
+        if lo == hi:
+            # Same fallback range np.histogram uses for constant data
+            lo, hi = lo - 0.5, hi + 0.5
+        
+        # Bin against the very edges that are returned (and drawn), each bin
+        # half-open [left, right) with the maximum counted in the last one
+        edges = np.linspace(lo, hi, bins + 1)
+        indices = np.searchsorted(edges, values, side='right') - 1
+        np.clip(indices, 0, bins - 1, out=indices)
+        return np.bincount(indices, minlength=bins), edges
+    
     def create_time_series(self, df: pd.DataFrame, date_column: str = 'created_utc',
                           filename: str = None) -> str:
         """
@@ -179,44 +365,64 @@ class SentimentVisualizer:
         Returns:
             Path to saved image
         """
-        if not filename:
-            filename = f"time_series_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self._path(filename, "time_series")
         
         if df.empty or date_column not in df.columns or 'avg_compound' not in df.columns:
-            fig, ax = plt.subplots()
+            fig, ax = self._get_axes()
             ax.text(0.5, 0.5, 'Insufficient data for time series', 
                    ha='center', va='center', fontsize=14)
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            plt.close()
+            self._save(fig, filepath)
             return filepath
         
-        # Ensure date column is datetime
-        df_copy = df.copy()
-        if not pd.api.types.is_datetime64_any_dtype(df_copy[date_column]):
-            df_copy[date_column] = pd.to_datetime(df_copy[date_column], errors='coerce')
+        # Only the date and score columns are plotted, so copy just those
+        df_copy = df[[date_column, 'avg_compound']].copy()
         
-        # Remove rows with invalid dates
-        df_copy = df_copy.dropna(subset=[date_column])
+        # Ensure date column is datetime: numeric columns are epoch seconds
+        # (converted without the string parser); strings are parsed with
+        # cache=True so repeated values are parsed once
+        dates = df_copy[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            if dates.dtype.kind in 'iuf':
+                df_copy[date_column] = pd.to_datetime(dates, unit='s', utc=True, errors='coerce')
+            else:
+                df_copy[date_column] = pd.to_datetime(dates, errors='coerce', utc=True,
+                                                      format='mixed', cache=True)
+        
+        # Remove rows with invalid dates (or no score to plot)
+        df_copy = df_copy.dropna(subset=[date_column, 'avg_compound'])
         
         if df_copy.empty:
-            fig, ax = plt.subplots()
+            fig, ax = self._get_axes()
             ax.text(0.5, 0.5, 'No valid dates for time series', 
                    ha='center', va='center', fontsize=14)
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            plt.close()
+            self._save(fig, filepath)
             return filepath
         
-        # Sort by date
-        df_copy = df_copy.sort_values(date_column)
+        show_markers = len(df_copy) <= MAX_MARKER_POINTS
+        if show_markers:
+            # Sort by date (stable, and fast on already mostly-ordered data)
+            df_copy = df_copy.sort_values(date_column, kind='mergesort')
+            dates = df_copy[date_column]
+            scores = df_copy['avg_compound'].to_numpy(dtype=float)
+        else:
+            # Too many posts to read individually: plot the daily mean trend
+            # (resample sorts by date itself)
+            daily = (df_copy.set_index(date_column)['avg_compound']
+                     .resample('1D').mean().dropna())
+            dates = daily.index.to_series()
+            scores = daily.to_numpy(dtype=float)
+            del daily
+        
+        # Only dates and scores are plotted; drop the working copy before rendering
+        del df_copy
         
         # Create plot
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig, ax = self._get_axes((12, 6), TIME_SERIES_MARGINS)
         
-        # Plot compound score over time
-        ax.plot(df_copy[date_column], df_copy['avg_compound'], 
-               marker='o', linestyle='-', linewidth=2, markersize=4, alpha=0.7)
+        # Plot compound score over time (markers only while they stay readable)
+        ax.plot(dates, scores,
+               marker='o' if show_markers else None,
+               linestyle='-', linewidth=2, markersize=4, alpha=0.7)
         
         # Add horizontal reference lines
         ax.axhline(y=0, color='black', linestyle='--', linewidth=1, alpha=0.5)
@@ -228,10 +434,8 @@ class SentimentVisualizer:
         ax.set_title('Sentiment Trends Over Time', fontsize=16, fontweight='bold')
         ax.grid(True, alpha=0.3)
         
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        ax.tick_params(axis='x', labelrotation=45)
+        self._save(fig, filepath)
         
         return filepath
     
@@ -246,39 +450,67 @@ class SentimentVisualizer:
         Returns:
             Path to saved image
         """
-        if not filename:
-            filename = f"source_comp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        
-        filepath = os.path.join(self.output_dir, filename)
+        filepath = self._path(filename, "source_comp", 'svg')
         
         if df.empty or 'source' not in df.columns or 'avg_compound' not in df.columns:
-            fig, ax = plt.subplots()
+            fig, ax = self._get_axes()
             ax.text(0.5, 0.5, 'Insufficient data for source comparison', 
                    ha='center', va='center', fontsize=14)
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
-            plt.close()
+            self._save(fig, filepath)
             return filepath
         
-        # Calculate average sentiment by source
-        source_sentiment = df.groupby('source')['avg_compound'].mean().sort_values()
+        # Calculate average sentiment by source; group on category codes
+        # without sorting, then sort only the (few) per-source means
+        sources = df['source'].astype('category')
+        source_sentiment = (df['avg_compound']
+                            .groupby(sources, sort=False, observed=True)
+                            .mean()
+                            .sort_values())
+        del sources
         
         # Create bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = self._get_axes((10, 6), SOURCE_MARGINS)
         
-        colors = ['#F44336' if x < 0 else '#4CAF50' for x in source_sentiment.values]
-        bars = ax.barh(source_sentiment.index, source_sentiment.values, color=colors, alpha=0.7)
+        colors = np.where(source_sentiment.to_numpy() < 0, '#F44336', '#4CAF50')
+        bars = ax.barh(source_sentiment.index.astype(str), source_sentiment.values, color=colors, alpha=0.7)
         
         ax.axvline(x=0, color='black', linestyle='--', linewidth=1)
         ax.set_xlabel('Average Compound Sentiment', fontsize=12, fontweight='bold')
         ax.set_title('Sentiment by Source', fontsize=16, fontweight='bold')
         ax.grid(True, alpha=0.3, axis='x')
         
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(fig, filepath)
         
         return filepath
     
+    @staticmethod
+    def _content_key(df: pd.DataFrame, summary: Dict) -> str:
+        """
+        Hash the inputs the charts are drawn from (and RENDER_VERSION)
+        
+        Args:
+            df: DataFrame with sentiment data
+            summary: Summary statistics dictionary
+        
+        Returns:
+            16-character hex key, or a timestamp if the data can't be hashed
+        """
+        try:
+            key = hashlib.blake2b(digest_size=8)
+            key.update(repr(RENDER_VERSION).encode())
+            key.update(repr([summary.get(name) for name in CHART_SUMMARY_KEYS]).encode())
+            
+            columns = [column for column in CHART_COLUMNS if column in df.columns]
+            key.update(repr((columns, len(df))).encode())
+            if columns and not df.empty:
+                row_hashes = pd.util.hash_pandas_object(df[columns], index=False)
+                key.update(row_hashes.to_numpy().tobytes())
+            
+            return key.hexdigest()
+        except Exception as e:
+            print(f"Could not hash chart data, rendering new charts: {e}")
+            return datetime.now().strftime('%Y%m%d_%H%M%S')
+    
     def create_all_visualizations(self, df: pd.DataFrame, summary: Dict) -> Dict[str, str]:
         """
         Create all visualizations
@@ -290,44 +522,50 @@ class SentimentVisualizer:
         Returns:
             Dictionary mapping visualization names to file paths
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Name the files by a hash of the chart inputs, so re-running an
+        # analysis on identical data reuses the charts already on disk
+        key = self._content_key(df, summary)
+        prefixes = {
+            'pie_chart': "pie",
+            'bar_chart': "bar",
+            'distribution': "dist",
+            'time_series': "timeseries",
+            'source_comparison': "sources",
+        }
+        filenames = {
+            name: f"{prefix}_{key}.{'svg' if name in VECTOR_CHARTS else self.image_format}"
+            for name, prefix in prefixes.items()
+        }
+        
+        paths = {name: self._dir + filename for name, filename in filenames.items()}
+        if all(os.path.exists(path) for path in paths.values()):
+            return paths
         
         visualizations = {}
         
-        try:
-            visualizations['pie_chart'] = self.create_sentiment_pie_chart(
-                summary, f"pie_{timestamp}.png"
-            )
-        except Exception as e:
-            print(f"Error creating pie chart: {e}")
-        
-        try:
-            visualizations['bar_chart'] = self.create_sentiment_bar_chart(
-                summary, f"bar_{timestamp}.png"
-            )
-        except Exception as e:
-            print(f"Error creating bar chart: {e}")
-        
-        try:
-            visualizations['distribution'] = self.create_score_distribution(
-                df, f"dist_{timestamp}.png"
-            )
-        except Exception as e:
-            print(f"Error creating distribution chart: {e}")
+        # The charts are independent, and Agg releases the GIL while
+        # rasterizing and encoding, so render them concurrently
+        tasks = [
+            ('pie_chart', "pie chart", self.create_sentiment_pie_chart, (summary,)),
+            ('bar_chart', "bar chart", self.create_sentiment_bar_chart, (summary,)),
+            ('distribution', "distribution chart", self.create_score_distribution, (df,)),
+            ('time_series', "time series", self.create_time_series, (df, 'created_utc')),
+            ('source_comparison', "source comparison", self.create_source_comparison, (df,)),
+        ]
+        futures = [
+            (name, label, self._executor.submit(create, *args, filenames[name]))
+            for name, label, create, args in tasks
+        ]
         
-        try:
-            visualizations['time_series'] = self.create_time_series(
-                df, filename=f"timeseries_{timestamp}.png"
-            )
-        except Exception as e:
-            print(f"Error creating time series: {e}")
+        for name, label, future in futures:
+            try:
+                visualizations[name] = future.result()
+            except Exception as e:
+                print(f"Error creating {label}: {e}")
         
-        try:
-            visualizations['source_comparison'] = self.create_source_comparison(
-                df, f"sources_{timestamp}.png"
-            )
-        except Exception as e:
-            print(f"Error creating source comparison: {e}")
+        # Rendering leaves large temporary frames and arrays behind; collect
+        # them now instead of letting them pile up across analyses
+        gc.collect()
         
         return visualizations
 